@@ -1,65 +1,289 @@
 import streamlit as st
+import streamlit.components.v1 as components
 from datetime import datetime, timedelta
 import gspread
+from gspread.utils import absolute_range_name, fill_gaps
 from google.oauth2.service_account import Credentials
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import time
+import json
+import os
+import threading
 import pytz  # For timezone conversion
 
 # Set the timezone to IST
 IST = pytz.timezone('Asia/Kolkata')
 
+# Google API scopes for reading and writing the tracker spreadsheet
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# Sheet columns holding hours; fetch_sheet_texts returns them as text
+NUMERIC_COLUMNS = ['Duration', 'Planned_Duration']
+
+# Free-text columns; Arrow-backed strings pickle and hash faster than object columns
+TEXT_COLUMNS = ['Activity_Description', 'Remarks', 'Planned_Activity']
+
+# Opened by name unless the secrets provide its key
+SPREADSHEET_NAME = "Priorities_Tracker_Database_Spreadsheet"
+
+# Columns the app reads from each worksheet (header row included)
+SHEET_RANGES = {
+    "Sheet1": "A:E",  # Timestamp, Priority, Activity_Description, Duration, Remarks
+    "Schedule": "A:D"  # Date, Priority, Planned_Activity, Planned_Duration
+}
+
+# Fixed set of priorities; stored as a categorical so groupbys work on integer codes
+PRIORITIES = ["Career", "Music", "Fitness", "Relationship", "Philosophy", "Finance"]
+
+# How long sheet data and results derived from it are reused before refetching
+CACHE_TTL_SECONDS = 60
+
+# Local copies of the sheets so later loads only download newly appended rows
+LOCAL_CACHE_DIR = os.path.expanduser("~/.cache/priorities_tracker")
+
+# Logged activities whose write to the sheet failed, kept until a later flush succeeds
+UNSYNCED_ROWS_PATH = os.path.join(LOCAL_CACHE_DIR, "unsynced_rows.json")
+
 def get_gsheet_credentials():
     """Create credentials object from Streamlit secrets"""
-    credentials = {
-        "type": st.secrets["gcp_service_account"]["type"],
-        "project_id": st.secrets["gcp_service_account"]["project_id"],
-        "private_key_id": st.secrets["gcp_service_account"]["private_key_id"],
-        "private_key": st.secrets["gcp_service_account"]["private_key"],
-        "client_email": st.secrets["gcp_service_account"]["client_email"],
-        "client_id": st.secrets["gcp_service_account"]["client_id"],
-        "auth_uri": st.secrets["gcp_service_account"]["auth_uri"],
-        "token_uri": st.secrets["gcp_service_account"]["token_uri"],
-        "auth_provider_x509_cert_url": st.secrets["gcp_service_account"]["auth_provider_x509_cert_url"],
-        "client_x509_cert_url": st.secrets["gcp_service_account"]["client_x509_cert_url"],
-        "universe_domain": st.secrets["gcp_service_account"]["universe_domain"]
-    }
-    
-    scopes = [
-        'https://www.googleapis.com/auth/spreadsheets',
-        'https://www.googleapis.com/auth/drive'
-    ]
-    
-    return Credentials.from_service_account_info(credentials, scopes=scopes)
+    # The secrets section already holds the service account info as a mapping
+    return Credentials.from_service_account_info(dict(st.secrets["gcp_service_account"]), scopes=SCOPES)
+
+@st.cache_resource
+def get_client():
+    """Create the authorized gspread client once per process"""
+    return gspread.authorize(get_gsheet_credentials())
+
+@st.cache_resource
+def get_spreadsheet():
+    """Open the tracker spreadsheet once per process"""
+    # Opening by key skips the Drive search that opening by name performs
+    sheet_key = st.secrets["gcp_service_account"].get("sheet_key")
+    if sheet_key:
+        return get_client().open_by_key(sheet_key)
+    return get_client().open(SPREADSHEET_NAME)
+
+@st.cache_resource
+def get_worksheet(sheet_name):
+    """Open a worksheet of the tracker spreadsheet once per process"""
+    return get_spreadsheet().worksheet(sheet_name)
+
+@st.cache_resource
+def get_write_lock():
+    """Lock shared by all sessions so buffered rows are written one batch at a time"""
+    return threading.Lock()
+
+def local_copy_path(sheet_name):
+    """Path of the local Parquet copy of a worksheet"""
+    return os.path.join(LOCAL_CACHE_DIR, f"{sheet_name}.parquet")
+
+def save_local_copy(df, sheet_name):
+    """Write the worksheet text to its local copy, replacing the old file atomically"""
+    path = local_copy_path(sheet_name)
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+        df.to_parquet(temp_path, compression='zstd', index=False)
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # Without a writable cache every load is simply a full fetch
 
+def drop_local_copies():
+    """Delete the local worksheet copies so the next load refetches everything"""
+    for sheet_name in SHEET_RANGES:
+        try:
+            os.remove(local_copy_path(sheet_name))
+        except FileNotFoundError:
+            pass
+
+def read_local_copy(sheet_name):
+    """Read the local copy of a worksheet, or None when there is no usable one"""
+    try:
+        df = pd.read_parquet(local_copy_path(sheet_name))
+    except (OSError, ValueError):
+        return None
+    return df if len(df) > 0 else None
+
+def frame_from_values(values):
+    """Build a text frame from a cell grid whose first row is the header"""
+    if not values:
+        return pd.DataFrame()
+    # The API drops trailing blank cells, so pad rows to the header width
+    values = fill_gaps(values, cols=len(values[0]))
+    return pd.DataFrame(values[1:], columns=values[0])
+
+def batch_get_values(ranges):
+    """Fetch several A1 ranges of the spreadsheet in one request"""
+    response = get_spreadsheet().values_batch_get(ranges)
+    return [value_range.get("values", []) for value_range in response["valueRanges"]]
+
+def first_column_matches(copy, column_values):
+    """Whether the sheet's first column, header included, still matches the local copy"""
+    saved = [copy.columns[0]] + copy.iloc[:, 0].tolist()
+    
+    # The API drops trailing blank cells and rows, so pad before comparing
+    current = [row[0] if row else '' for row in column_values[:len(saved)]]
+    current += [''] * (len(saved) - len(current))
+    return current == saved
+
+# Every worksheet comes from this one batched request, so loading several sheets costs a single API call
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_sheet_texts():
+    """Fetch every worksheet as text in one request, downloading only rows appended since the local copies"""
+    copies = {sheet_name: read_local_copy(sheet_name) for sheet_name in SHEET_RANGES}
+    
+    # With a local copy, start at its last saved row: it always exists and confirms the copy still matches
+    ranges = []
+    for sheet_name, sheet_range in SHEET_RANGES.items():
+        if copies[sheet_name] is not None:
+            first_column, last_column = sheet_range.split(":")
+            sheet_range = f"{first_column}{len(copies[sheet_name]) + 1}:{last_column}"
+        ranges.append(absolute_range_name(sheet_name, sheet_range))
+    
+    # Also fetch the first column of each copied sheet, which catches rows edited, inserted or deleted above the last one
+    checked = [sheet_name for sheet_name in SHEET_RANGES if copies[sheet_name] is not None]
+    for sheet_name in checked:
+        first_column = SHEET_RANGES[sheet_name].split(":")[0]
+        ranges.append(absolute_range_name(sheet_name, f"{first_column}:{first_column}"))
+    
+    responses = batch_get_values(ranges)
+    key_columns = dict(zip(checked, responses[len(SHEET_RANGES):]))
+    
+    texts = {}
+    stale = []
+    for sheet_name, values in zip(SHEET_RANGES, responses):
+        copy = copies[sheet_name]
+        if copy is None:
+            texts[sheet_name] = frame_from_values(values)
+            if values:
+                save_local_copy(texts[sheet_name], sheet_name)
+            continue
+        
+        new_rows = frame_from_values([list(copy.columns)] + values)
+        if len(new_rows) == 0 or new_rows.iloc[0].tolist() != copy.iloc[-1].tolist():
+            stale.append(sheet_name)
+        elif not first_column_matches(copy, key_columns[sheet_name]):
+            stale.append(sheet_name)
+        elif len(new_rows) == 1:
+            texts[sheet_name] = copy
+        else:
+            texts[sheet_name] = pd.concat([copy, new_rows.iloc[1:]], ignore_index=True)
+            save_local_copy(texts[sheet_name], sheet_name)
+    
+    # Rows were edited in place: load those sheets completely
+    if stale:
+        ranges = [absolute_range_name(sheet_name, SHEET_RANGES[sheet_name]) for sheet_name in stale]
+        for sheet_name, values in zip(stale, batch_get_values(ranges)):
+            texts[sheet_name] = frame_from_values(values)
+            save_local_copy(texts[sheet_name], sheet_name)
+    
+    return texts
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
 def load_data(sheet_name):
     """Load and process data from Google Sheets"""
-    creds = get_gsheet_credentials()
-    client = gspread.authorize(creds)
-    sheet = client.open("Priorities_Tracker_Database_Spreadsheet").worksheet(sheet_name)
+    # Raw cell text, fetched for all sheets in one request
+    df = fetch_sheet_texts()[sheet_name]
+    
+    # Parse hours into a float32 column; blank or malformed cells count as zero hours
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce', downcast='float').fillna(0)
+    
+    for column in TEXT_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('string[pyarrow]')
     
-    data = sheet.get_all_records()
-    df = pd.DataFrame(data)
+    # Labels outside PRIORITIES (typos, legacy names) get categories of their own so their hours still count
+    if 'Priority' in df.columns:
+        unlisted = sorted(set(df['Priority'].dropna()) - set(PRIORITIES) - {''})
+        df['Priority'] = pd.Categorical(df['Priority'], categories=PRIORITIES + unlisted)
     
-    # Convert timestamp to datetime and handle timezone
+    # The sheet stores naive IST wall-clock times in whole seconds, so localize directly
     if 'Timestamp' in df.columns:
-        df['Timestamp'] = pd.to_datetime(df['Timestamp'])
-        if df['Timestamp'].dt.tz is None:  # Check if timezone-naive
-            df['Timestamp'] = df['Timestamp'].dt.tz_localize(IST)  # Localize to IST
-        else:  # If already timezone-aware, convert to IST
-            df['Timestamp'] = df['Timestamp'].dt.tz_convert(IST)
-    
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'])
-        if df['Date'].dt.tz is None:  # Check if timezone-naive
-            df['Date'] = df['Date'].dt.tz_localize(IST)
-        else:  # If already timezone-aware, convert to IST
-            df['Date'] = df['Date'].dt.tz_convert(IST)
+        timestamps = pd.to_datetime(df['Timestamp'], format="%Y-%m-%d %H:%M:%S", cache=True)
+        df['Timestamp'] = timestamps.dt.as_unit('s').dt.tz_localize(IST)
+        
+        # Cleared sheet rows come back blank; drop them so sorted slices only see real activities
+        df = df[df['Timestamp'].notna()]
+        
+        # Calendar day of each activity, kept as datetime64 so it groups on integer keys
+        df['Date'] = df['Timestamp'].dt.normalize()
+        
+        # Keep rows in time order so time windows can be sliced by binary search
+        df = df.sort_values('Timestamp', kind='stable', ignore_index=True)
+    
+    elif 'Date' in df.columns:
+        dates = pd.to_datetime(df['Date'], format="%Y-%m-%d", cache=True)
+        df['Date'] = dates.dt.as_unit('s').dt.tz_localize(IST)
     
     return df
 
+def invalidate_data():
+    """Drop cached sheet data and everything computed from it"""
+    fetch_sheet_texts.clear()
+    load_data.clear()
+    cached_kpis.clear()
+    cached_streaks.clear()
+
+def read_unsynced_rows():
+    """Rows left on disk by earlier failed writes"""
+    try:
+        with open(UNSYNCED_ROWS_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def save_unsynced_rows(rows):
+    """Replace the rows kept on disk, deleting the file when none are left; returns whether it worked"""
+    try:
+        if not rows:
+            if os.path.exists(UNSYNCED_ROWS_PATH):
+                os.remove(UNSYNCED_ROWS_PATH)
+            return True
+        os.makedirs(LOCAL_CACHE_DIR, exist_ok=True)
+        temp_path = f"{UNSYNCED_ROWS_PATH}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(rows, f)
+        os.replace(temp_path, UNSYNCED_ROWS_PATH)
+        return True
+    except OSError:
+        return False
+
+def flush_pending_rows(pending_rows, sheet, lock):
+    """Append all buffered rows, plus any left over from failed writes, to the worksheet in a single API call"""
+    with lock:
+        # Rows from earlier failed writes go first so the log stays in time order
+        unsynced = read_unsynced_rows()
+        rows = list(pending_rows)
+        if unsynced or rows:
+            try:
+                sheet.append_rows(unsynced + rows)
+            except Exception:
+                # Move the rows to disk so a closed tab or restart doesn't lose them
+                if save_unsynced_rows(unsynced + rows):
+                    del pending_rows[:len(rows)]
+                raise
+            save_unsynced_rows([])
+            # Drop only what was written; rows logged meanwhile stay queued
+            del pending_rows[:len(rows)]
+            invalidate_data()
+
+def flush_in_background(pending_rows, sheet, lock, sync_status):
+    """Flush buffered rows off the script thread, flagging a failed write for the UI"""
+    try:
+        flush_pending_rows(pending_rows, sheet, lock)
+        sync_status['failed'] = False
+    except Exception:
+        sync_status['failed'] = True
+
 def format_time(seconds):
     """Convert seconds to HH:MM:SS format"""
     hours = seconds // 3600
@@ -67,34 +291,63 @@ def format_time(seconds):
     seconds = seconds % 60
     return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
 
+def format_time_vec(seconds):
+    """Convert an array or Series of seconds to HH:MM:SS strings"""
+    hours, remainder = np.divmod(np.asarray(seconds).astype(np.int64), 3600)
+    minutes, seconds = np.divmod(remainder, 60)
+    hh, mm, ss = (np.char.zfill(part.astype(str), 2) for part in (hours, minutes, seconds))
+    return np.char.add(np.char.add(np.char.add(hh, ':'), np.char.add(mm, ':')), ss)
+
+def streaks_kernel(codes, dates, n_priorities):
+    """Current streak, longest streak and last active day per priority code"""
+    current = np.zeros(n_priorities, dtype=np.int64)
+    longest = np.zeros(n_priorities, dtype=np.int64)
+    last_date = np.zeros(n_priorities, dtype=np.int64)
+    if len(codes) == 0:
+        return current, longest, last_date
+    
+    # Collapse repeated (priority, day) pairs; input is sorted by code then day
+    keep = np.ones(len(codes), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (dates[1:] != dates[:-1])
+    codes, dates = codes[keep], dates[keep]
+    
+    # A run starts at a new priority or after a gap of more than one day
+    run_start = np.ones(len(codes), dtype=bool)
+    run_start[1:] = (codes[1:] != codes[:-1]) | (np.diff(dates) != 1)
+    run_starts = np.flatnonzero(run_start)
+    run_lengths = np.diff(np.append(run_starts, len(codes)))
+    run_codes = codes[run_starts]
+    np.maximum.at(longest, run_codes, run_lengths)
+    
+    # The final run and day of each priority give its current streak and last activity
+    is_last_run = np.append(run_codes[1:] != run_codes[:-1], True)
+    current[run_codes[is_last_run]] = run_lengths[is_last_run]
+    is_last_day = np.append(codes[1:] != codes[:-1], True)
+    last_date[codes[is_last_day]] = dates[is_last_day]
+    
+    return current, longest, last_date
+
 def calculate_streaks(df):
     """Calculate activity streaks by priority"""
     if df.empty:
         return {}
     
-    df['Date'] = df['Timestamp'].dt.date
-    streaks = {}
+    # Priority codes and local calendar-day ordinals, ordered by priority then day
+    codes = df['Priority'].cat.codes.to_numpy()
+    dates = df['Date'].dt.tz_localize(None).to_numpy().astype('datetime64[D]').view('i8')
+    valid = codes >= 0
+    codes, dates = codes[valid], dates[valid]
+    order = np.lexsort((dates, codes))
     
-    for priority in df['Priority'].unique():
-        priority_df = df[df['Priority'] == priority]
-        priority_dates = sorted(priority_df['Date'].unique())
-        
-        current_streak = 1
-        max_streak = 1
-        last_date = priority_dates[0]
-        
-        for date in priority_dates[1:]:
-            if (date - last_date).days == 1:
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                current_streak = 1
-            last_date = date
-            
-        streaks[priority] = {
-            'current': current_streak,
-            'max': max_streak,
-            'last_activity': max(priority_dates)
+    priorities = df['Priority'].cat.categories
+    current, longest, last_date = streaks_kernel(codes[order], dates[order], len(priorities))
+    
+    streaks = {}
+    for code in np.flatnonzero(longest):
+        streaks[priorities[code]] = {
+            'current': int(current[code]),
+            'max': int(longest[code]),
+            'last_activity': pd.Timestamp(int(last_date[code]), unit='D').tz_localize(IST)
         }
     
     return streaks
@@ -103,7 +356,11 @@ def calculate_kpis(df):
     """Calculate key performance indicators from the data"""
     kpis = {}
     
-    # Total hours
+    # Daily totals per priority, shared by all the KPIs below
+    daily_totals = df.groupby(['Date', 'Priority'], sort=False, observed=True)['Duration'].sum()
+    priority_totals = daily_totals.groupby(level='Priority', observed=True).sum()
+    
+    # Total hours, including rows without a priority
     kpis['total_hours'] = df['Duration'].sum()
     
     # Calculate date range and overall average
@@ -111,19 +368,77 @@ def calculate_kpis(df):
     kpis['avg_hours_per_day'] = kpis['total_hours'] / date_range if date_range > 0 else 0
     
     # Calculate daily averages per priority
-    df['Date'] = df['Timestamp'].dt.date
-    priority_daily_totals = df.groupby(['Date', 'Priority'])['Duration'].sum().reset_index()
-    priority_avgs = priority_daily_totals.groupby('Priority')['Duration'].mean()
-    kpis['priority_averages'] = priority_avgs.to_dict()
+    kpis['priority_averages'] = daily_totals.groupby(level='Priority', observed=True).mean().to_dict()
     
     # Most active priority (based on total hours)
-    most_active = df.groupby('Priority')['Duration'].sum().idxmax()
-    kpis['most_active_priority'] = most_active
+    kpis['most_active_priority'] = priority_totals.idxmax()
+    
+    # Chart inputs as plain records; only the aggregated keys become calendar dates
+    daily_hours = df.groupby('Date')['Duration'].sum()  # Sorted: the trend needs date order
+    kpis['daily_hours'] = list(zip(daily_hours.index.date, daily_hours.tolist()))
+    kpis['priority_hours'] = list(zip(priority_totals.index, priority_totals.tolist()))
     
     return kpis
 
+def window_start(time_filter, now_ist):
+    """Start of the selected time period, or None for all time"""
+    if time_filter == "All time":
+        return None
+    days = int(time_filter.split()[1])
+    return now_ist - timedelta(days=days)
+
+def filter_by_time(df, time_filter, now_ist):
+    """Keep the activities inside the selected time period"""
+    cutoff_date = window_start(time_filter, now_ist)
+    if cutoff_date is not None:
+        # Rows are sorted by Timestamp, so binary-search the window start
+        df = df.iloc[df['Timestamp'].searchsorted(cutoff_date):]
+    return df
+
+# Keyed on the filter string rather than the DataFrame, which would be costly to hash;
+# invalidate_data() clears them whenever the sheet data changes
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def cached_kpis(time_filter):
+    """Calculate KPIs for a time period, reusing the result across reruns"""
+    return calculate_kpis(filter_by_time(load_data("Sheet1"), time_filter, datetime.now(IST)))
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def cached_streaks(time_filter):
+    """Calculate streaks for a time period, reusing the result across reruns"""
+    return calculate_streaks(filter_by_time(load_data("Sheet1"), time_filter, datetime.now(IST)))
+
+def start_timer():
+    """Start the activity timer"""
+    st.session_state.timer_running = True
+    st.session_state.start_time = time.time()
+
+def stop_timer():
+    """Stop the activity timer and keep the elapsed time"""
+    st.session_state.timer_running = False
+    if st.session_state.start_time:
+        st.session_state.elapsed_time = time.time() - st.session_state.start_time
+
+def render_live_clock(elapsed_seconds):
+    """Show a running HH:MM:SS clock that the browser advances on its own"""
+    # Counting from the elapsed time rather than a server timestamp avoids clock skew
+    components.html(f"""
+        <div id="clock" style="font-family: 'Source Sans Pro', sans-serif; font-size: 1.75rem; font-weight: 600;">
+            {format_time(elapsed_seconds)}
+        </div>
+        <script>
+            const start = Date.now() - {int(elapsed_seconds * 1000)};
+            const clock = document.getElementById("clock");
+            const pad = (n) => String(n).padStart(2, "0");
+            setInterval(() => {{
+                const s = Math.floor((Date.now() - start) / 1000);
+                clock.textContent = `${{pad(Math.floor(s / 3600))}}:${{pad(Math.floor(s % 3600 / 60))}}:${{pad(s % 60)}}`;
+            }}, 1000);
+        </script>
+    """, height=60)
+
+@st.fragment
 def create_timer_section():
-    """Create and manage the timer interface"""
+    """Create and manage the timer interface; only its own buttons rerun it"""
     st.subheader("Activity Timer")
     
     if 'timer_running' not in st.session_state:
@@ -133,41 +448,81 @@ def create_timer_section():
     
     col1, col2 = st.columns([3, 1])
     
+    # Callbacks update the state before the fragment reruns, so no st.rerun is needed
     with col1:
         if not st.session_state.timer_running:
-            if st.button("Start Timer"):
-                st.session_state.timer_running = True
-                st.session_state.start_time = time.time()
-                st.rerun()
+            st.button("Start Timer", on_click=start_timer)
         else:
-            if st.button("Stop Timer"):
-                st.session_state.timer_running = False
-                if st.session_state.start_time:
-                    st.session_state.elapsed_time = time.time() - st.session_state.start_time
-                st.rerun()
+            st.button("Stop Timer", on_click=stop_timer)
     
     with col2:
         if st.session_state.timer_running:
             st.session_state.elapsed_time = time.time() - st.session_state.start_time
-        st.markdown(f"### {format_time(st.session_state.elapsed_time)}")
-    
-    return st.session_state.elapsed_time / 3600
+            render_live_clock(st.session_state.elapsed_time)
+        else:
+            st.markdown(f"### {format_time(st.session_state.elapsed_time)}")
+    
+    # Show manual duration input if timer is not running
+    if not st.session_state.timer_running:
+        elapsed_hours = st.session_state.elapsed_time / 3600
+        st.number_input("Duration (in hours)", 
+                        min_value=0.0, 
+                        step=0.25,
+                        value=float(elapsed_hours) if elapsed_hours > 0 else 0.0,
+                        key="duration")
 
-def create_dashboard(time_filter):
+# Figures are cached on plain (x, y) records, which are cheap to hash compared to DataFrames
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_trend_fig(daily_hours_records, avg_hours):
+    """Build the daily hours line chart with the average as a reference line"""
+    dates, hours = zip(*daily_hours_records) if daily_hours_records else ((), ())
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=hours,
+        mode='lines+markers',
+        name='Daily Hours'
+    ))
+    fig.add_hline(
+        y=avg_hours,
+        line_dash="dash",
+        annotation_text=f"Average: {avg_hours:.2f} hours"
+    )
+    fig.update_layout(
+        title="Daily Hours vs Average",
+        xaxis_title="Date",
+        yaxis_title="Hours",
+        hovermode='x'
+    )
+    return fig
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def build_priority_pie(priority_records):
+    """Build the pie chart of total hours per priority"""
+    priority_data = pd.DataFrame.from_records(priority_records, columns=['Priority', 'Duration'])
+    return px.pie(
+        priority_data,
+        values='Duration',
+        names='Priority',
+        title='Time Distribution by Priority'
+    )
+
+def create_dashboard(time_filter, now_ist):
     """Create the analysis dashboard"""
     st.title("Activity Analysis Dashboard")
     
-    # Load data
-    df = load_data("Sheet1")
+    # Load data and apply time filter
+    activity_df = load_data("Sheet1")
+    df = filter_by_time(activity_df, time_filter, now_ist)
     
-    # Apply time filter
-    if time_filter != "All time":
-        days = int(time_filter.split()[1])
-        cutoff_date = datetime.now(IST) - timedelta(days=days)
-        df = df[df['Timestamp'] >= cutoff_date]
+    # Rows logged under a priority outside the list are still counted; point them out so they can be fixed
+    unlisted = activity_df['Priority'].notna() & ~activity_df['Priority'].isin(PRIORITIES)
+    if unlisted.any():
+        labels = ", ".join(f"'{label}'" for label in activity_df.loc[unlisted, 'Priority'].unique())
+        st.warning(f"{unlisted.sum()} logged activities use a priority outside the list: {labels}")
     
     # Calculate KPIs
-    kpis = calculate_kpis(df)
+    kpis = cached_kpis(time_filter)
     
     # Display KPIs
     st.subheader("Key Performance Indicators")
@@ -208,7 +563,7 @@ def create_dashboard(time_filter):
     
     # Display streaks
     st.subheader("Activity Streaks")
-    streaks = calculate_streaks(df)
+    streaks = cached_streaks(time_filter)
     for priority, streak_data in streaks.items():
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -220,41 +575,18 @@ def create_dashboard(time_filter):
     
     # Daily Hours Trend
     st.subheader("Daily Hours Trend")
-    daily_hours = df.groupby(df['Timestamp'].dt.date)['Duration'].sum().reset_index()
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=daily_hours['Timestamp'],
-        y=daily_hours['Duration'],
-        mode='lines+markers',
-        name='Daily Hours'
-    ))
-    fig.add_hline(
-        y=kpis['avg_hours_per_day'],
-        line_dash="dash",
-        annotation_text=f"Average: {kpis['avg_hours_per_day']:.2f} hours"
-    )
-    fig.update_layout(
-        title="Daily Hours vs Average",
-        xaxis_title="Date",
-        yaxis_title="Hours",
-        hovermode='x'
-    )
+    fig = build_trend_fig(kpis['daily_hours'], float(kpis['avg_hours_per_day']))
     st.plotly_chart(fig)
     
     # Priority Distribution
     st.subheader("Time Distribution by Priority")
-    priority_data = df.groupby('Priority')['Duration'].sum().reset_index()
-    fig_pie = px.pie(
-        priority_data,
-        values='Duration',
-        names='Priority',
-        title='Time Distribution by Priority'
-    )
+    fig_pie = build_priority_pie(kpis['priority_hours'])
     st.plotly_chart(fig_pie)
     
     # Recent Activities
     st.subheader("Recent Activities")
-    recent_activities = df.sort_values('Timestamp', ascending=False).head(5)
+    # load_data keeps rows in Timestamp order, so the newest five are the last five
+    recent_activities = df.tail(5).iloc[::-1].copy()
     
     # Format the Timestamp column to display in a human-readable format
     recent_activities['Timestamp'] = recent_activities['Timestamp'].dt.strftime("%Y-%m-%d %H:%M:%S")
@@ -264,19 +596,21 @@ def create_dashboard(time_filter):
         hide_index=True
     )
 
-def create_schedule_section():
+def create_schedule_section(now_ist):
     """Create and manage the schedule interface"""
     st.title("Schedule Planner")
     
     # Load schedule data
     schedule_df = load_data("Schedule")
     
-    # Filter today's schedule
-    today = datetime.now(IST).date()
-    today_schedule = schedule_df[pd.to_datetime(schedule_df['Date']).dt.date == today]
+    # Filter today's schedule; Date already holds IST midnights
+    today = pd.Timestamp(now_ist).normalize()
     
-    # Format the 'Date' column to display only the date (without time)
-    today_schedule['Date'] = today_schedule['Date'].dt.date
+    # Format the 'Date' column to display only the date (without time), on the filtered rows only
+    today_schedule = schedule_df.loc[
+        schedule_df['Date'] == today,
+        ['Date', 'Priority', 'Planned_Activity', 'Planned_Duration']
+    ].assign(Date=lambda d: d['Date'].dt.date)
     
     # Display today's schedule
     st.subheader("Today's Schedule")
@@ -285,33 +619,29 @@ def create_schedule_section():
     # Add new schedule
     st.subheader("Add New Schedule")
     with st.form("schedule_form"):
-        date = st.date_input("Date", value=datetime.now(IST).date())  # Set default date to today in IST
-        priority = st.selectbox("Priority", ["Career", "Music", "Fitness", "Relationship", "Philosophy", "Finance"])
+        date = st.date_input("Date", value=now_ist.date())  # Set default date to today in IST
+        priority = st.selectbox("Priority", PRIORITIES)
         planned_activity = st.text_input("Planned Activity")
         planned_duration = st.number_input("Planned Duration (in hours)", min_value=0.0, step=0.25)
         
         if st.form_submit_button("Add Schedule"):
             try:
-                creds = get_gsheet_credentials()
-                client = gspread.authorize(creds)
-                sheet = client.open("Priorities_Tracker_Database_Spreadsheet").worksheet("Schedule")
+                sheet = get_worksheet("Schedule")
                 
-                new_row = [date.strftime("%Y-%m-%d"), priority, planned_activity, planned_duration]
-                sheet.append_row(new_row)
+                # Written the same way as logged activities: one append_rows call per batch
+                rows = [[date.strftime("%Y-%m-%d"), priority, planned_activity, planned_duration]]
+                sheet.append_rows(rows)
+                invalidate_data()  # Make the new schedule visible on the next run
                 
                 st.success("Schedule added successfully!")
                 st.rerun()
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
 
-def create_plan_vs_actual_analysis(time_filter):
-    """Create visualizations for planned vs actual hours"""
+def create_plan_vs_actual_analysis(schedule_df, logged_df, time_filter, now_ist):
+    """Create visualizations for planned vs actual hours; returns the comparison and KPI frames"""
     st.title("Plan vs Actual Analysis")
     
-    # Load data
-    schedule_df = load_data("Schedule")
-    logged_df = load_data("Sheet1")
-    
     # Check if required columns exist
     if 'Duration' not in logged_df.columns:
         st.error("The 'Duration' column is missing in the logged activities data.")
@@ -321,71 +651,46 @@ def create_plan_vs_actual_analysis(time_filter):
         st.error("The 'Planned_Duration' column is missing in the schedule data.")
         return
     
-    # Convert 'Date' column to datetime in both DataFrames
-    schedule_df['Date'] = pd.to_datetime(schedule_df['Date'])
-    if schedule_df['Date'].dt.tz is None:
-        schedule_df['Date'] = schedule_df['Date'].dt.tz_localize(IST)
-    else:
-        schedule_df['Date'] = schedule_df['Date'].dt.tz_convert(IST)
-    
-    # Convert 'Timestamp' column to datetime and handle timezone
-    logged_df['Timestamp'] = pd.to_datetime(logged_df['Timestamp'])
-    if logged_df['Timestamp'].dt.tz is None:
-        logged_df['Timestamp'] = logged_df['Timestamp'].dt.tz_localize(IST)
-    else:
-        logged_df['Timestamp'] = logged_df['Timestamp'].dt.tz_convert(IST)
-    
-    logged_df['Date'] = logged_df['Timestamp'].dt.date
-    
+    # load_data already parsed both Date columns as IST midnights
     # Apply time filter
-    if time_filter != "All time":
-        days = int(time_filter.split()[1])
-        cutoff_date = (datetime.now(IST) - timedelta(days=days)).date()  # Convert to date
-        logged_df = logged_df[logged_df['Date'] >= cutoff_date]
-        schedule_df = schedule_df[schedule_df['Date'].dt.date >= cutoff_date]
-    
-    # Aggregate planned hours by date and priority
-    planned_hours = schedule_df.groupby(['Date', 'Priority'])['Planned_Duration'].sum().reset_index()
-    
-    # Aggregate actual hours by date and priority
-    actual_hours = logged_df.groupby(['Date', 'Priority'])['Duration'].sum().reset_index()
-    
-    # Ensure 'Date' column in actual_hours is datetime and timezone-aware
-    actual_hours['Date'] = pd.to_datetime(actual_hours['Date']).dt.tz_localize(IST)
-    
-    # Rename 'Duration' column to 'Duration_actual' in actual_hours
-    actual_hours = actual_hours.rename(columns={'Duration': 'Duration_actual'})
-    
-    # Merge planned and actual hours
-    comparison_df = pd.merge(
-        planned_hours,
-        actual_hours,
-        on=['Date', 'Priority'],
-        how='outer',  # Include all dates and priorities from both DataFrames
-    )
-    
-    # Fill NaN values in 'Duration_actual' and 'Planned_Duration' with 0
-    comparison_df['Duration_actual'] = comparison_df['Duration_actual'].fillna(0)
-    comparison_df['Planned_Duration'] = comparison_df['Planned_Duration'].fillna(0)
+    cutoff_date = window_start(time_filter, now_ist)
+    if cutoff_date is not None:
+        cutoff_date = pd.Timestamp(cutoff_date).normalize()
+        # The log is sorted by time, so its window is a binary-searched slice
+        logged_df = logged_df.iloc[logged_df['Date'].searchsorted(cutoff_date):]
+        # The schedule is unsorted; compare the raw datetime64 values to skip tz handling
+        schedule_df = schedule_df[schedule_df['Date'].values >= cutoff_date.to_datetime64()]
+    
+    # Aggregate planned and actual hours by date and priority, keyed on (Date, Priority)
+    planned_hours = schedule_df.groupby(['Date', 'Priority'], sort=False, observed=True)['Planned_Duration'].sum()
+    actual_hours = logged_df.groupby(['Date', 'Priority'], sort=False, observed=True)['Duration'].sum()
+    
+    # Align on the shared index to include all dates and priorities from both sides
+    comparison_df = pd.concat(
+        [planned_hours, actual_hours.rename('Duration_actual')],
+        axis=1,
+        sort=True  # Date order, as the outer merge gave
+    ).fillna(0).reset_index()
     
     # Calculate the difference between planned and actual hours
     comparison_df['Difference'] = comparison_df['Duration_actual'] - comparison_df['Planned_Duration']
     
-    # Calculate KPIs for each priority
-    kpi_df = comparison_df.groupby('Priority').agg(
-        Total_Planned_Hours=('Planned_Duration', 'sum'),
-        Total_Actual_Hours=('Duration_actual', 'sum'),
-        Total_Difference=('Difference', 'sum')
-    ).reset_index()
-    
-    # Calculate Percentage Deviation
-    kpi_df['Percentage_Deviation'] = kpi_df.apply(
-        lambda row: (row['Total_Difference'] / row['Total_Planned_Hours']) * 100 if row['Total_Planned_Hours'] != 0 else 0,
-        axis=1
-    )
+    # Calculate KPIs for each priority in one summing pass over the three columns
+    kpi_df = comparison_df.groupby('Priority', observed=True)[
+        ['Planned_Duration', 'Duration_actual', 'Difference']
+    ].sum().rename(columns={
+        'Planned_Duration': 'Total_Planned_Hours',
+        'Duration_actual': 'Total_Actual_Hours',
+        'Difference': 'Total_Difference'
+    }).reset_index()
+    
+    # Calculate Percentage Deviation; priorities with no planned hours show 0
+    planned = kpi_df['Total_Planned_Hours'].to_numpy(dtype=float)
+    difference = kpi_df['Total_Difference'].to_numpy(dtype=float)
+    deviation = np.divide(difference, planned, out=np.zeros_like(difference), where=planned != 0) * 100
     
     # Format Percentage Deviation with a % symbol
-    kpi_df['Percentage_Deviation'] = kpi_df['Percentage_Deviation'].apply(lambda x: f"{x:.2f}%")
+    kpi_df['Percentage_Deviation'] = pd.Series(deviation, index=kpi_df.index).map('{:.2f}%'.format)
     
     # Display KPIs
     st.subheader("Performance KPIs by Priority")
@@ -394,33 +699,37 @@ def create_plan_vs_actual_analysis(time_filter):
     # Visualize planned vs actual hours
     st.subheader("Planned vs Actual Hours Over Time")
     
-    # Reshape the DataFrame for Plotly
-    melted_df = pd.melt(
-        comparison_df,
-        id_vars=['Date', 'Priority'],
-        value_vars=['Planned_Duration', 'Duration_actual'],
-        var_name='Type',
-        value_name='Hours'
-    )
+    # Planned and actual hours side by side, drawn from the wide frame without reshaping
+    hour_columns = ['Planned_Duration', 'Duration_actual']
+    fig = make_subplots(rows=1, cols=2, shared_yaxes=True, subplot_titles=[f"Type={column}" for column in hour_columns])
+    colors = px.colors.qualitative.Plotly  # Use 6 distinct colors
     
     # Create a clustered bar chart for each priority
-    fig = px.bar(
-        melted_df,
-        x='Date',
-        y='Hours',
-        color='Priority',
-        facet_col='Type',  # Split into separate bars for planned and actual
-        barmode='group',
-        labels={'Hours': 'Hours', 'Type': 'Type'},
-        title="Planned vs Actual Hours by Priority",
-        color_discrete_sequence=px.colors.qualitative.Plotly  # Use 6 distinct colors
-    )
+    for i, (priority, rows) in enumerate(comparison_df.groupby('Priority', sort=False, observed=True)):
+        for col, column in enumerate(hour_columns, start=1):
+            fig.add_trace(go.Bar(
+                x=rows['Date'],
+                y=rows[column],
+                name=priority,
+                legendgroup=priority,
+                showlegend=col == 1,
+                marker_color=colors[i % len(colors)]
+            ), row=1, col=col)
+    
+    fig.update_layout(barmode='group', title="Planned vs Actual Hours by Priority", legend_title_text='Priority')
+    fig.update_xaxes(title_text='Date')
+    fig.update_yaxes(title_text='Hours', col=1)
     st.plotly_chart(fig)
+    
+    return comparison_df, kpi_df
 
 # Main app
 def main():
     st.set_page_config(page_title="Activity Tracker", layout="wide")
     
+    # One clock reading per rerun, shared by every section below
+    now_ist = datetime.now(IST)
+    
     # Time period filter in the sidebar
     st.sidebar.header("Filters")
     time_filter = st.sidebar.selectbox(
@@ -429,36 +738,44 @@ def main():
         key="time_filter"  # Unique key for this selectbox
     )
     
+    # Sheet data is cached between reruns; allow a manual reload
+    if st.sidebar.button("Refresh data", help="Reload every sheet in full; needed to pick up edits to cells other than the first column of older rows"):
+        drop_local_copies()
+        invalidate_data()
+    
     # Create tabs
     tab1, tab2, tab3, tab4 = st.tabs(["Log Activity", "Analysis Dashboard", "Schedule Planner", "Plan vs Actual Analysis"])
     
     with tab1:
         st.title("Activity Logger")
-        priority = st.selectbox("Priority", ["Career", "Music", "Fitness", "Relationship", "Philosophy", "Finance"])
-        activity = st.text_input("Activity Description")
+        if 'pending_rows' not in st.session_state:
+            st.session_state.pending_rows = []
+        if 'sync_status' not in st.session_state:
+            st.session_state.sync_status = {'failed': False}
         
-        # Add timer section
-        elapsed_hours = create_timer_section()
+        priority = st.selectbox("Priority", PRIORITIES)
+        activity = st.text_input("Activity Description")
         
-        # Show manual duration input if timer is not running
-        if not st.session_state.timer_running:
-            duration = st.number_input("Duration (in hours)", 
-                                     min_value=0.0, 
-                                     step=0.25,
-                                     value=float(elapsed_hours) if elapsed_hours > 0 else 0.0)
+        # Add timer section; it reruns on its own, so read its state back from the session
+        create_timer_section()
+        elapsed_hours = st.session_state.elapsed_time / 3600
         
         remarks = st.text_area("Remarks (Optional)")
         
         if st.button("Log Activity"):
             try:
-                creds = get_gsheet_credentials()
-                client = gspread.authorize(creds)
-                sheet = client.open("Priorities_Tracker_Database_Spreadsheet").sheet1
+                # The rerun started on this click, so its clock reading is the log time
+                now = now_ist.strftime("%Y-%m-%d %H:%M:%S")
+                final_duration = elapsed_hours if elapsed_hours > 0 else st.session_state.get("duration", 0.0)
+                st.session_state.pending_rows.append([now, priority, activity, final_duration, remarks])
                 
-                # Capture the current time in IST
-                now = datetime.now(IST).strftime("%Y-%m-%d %H:%M:%S")
-                final_duration = elapsed_hours if elapsed_hours > 0 else duration
-                sheet.append_row([now, priority, activity, final_duration, remarks])
+                # Write in the background so the UI doesn't wait on the Sheets API;
+                # the caches are cleared once the write lands, so the new row shows on the next rerun
+                threading.Thread(
+                    target=flush_in_background,
+                    args=(st.session_state.pending_rows, get_worksheet("Sheet1"), get_write_lock(), st.session_state.sync_status),
+                    daemon=True
+                ).start()
                 
                 # Reset timer after logging
                 st.session_state.timer_running = False
@@ -469,15 +786,30 @@ def main():
                 st.rerun()
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
+        
+        # Rows whose write failed wait on disk (or in the session, if the disk is not writable) until synced
+        unsynced_count = len(read_unsynced_rows())
+        if st.session_state.sync_status['failed']:
+            unsynced_count += len(st.session_state.pending_rows)
+        if unsynced_count:
+            st.caption(f"{unsynced_count} logged activities waiting to sync")
+            if st.button("Sync now"):
+                try:
+                    flush_pending_rows(st.session_state.pending_rows, get_worksheet("Sheet1"), get_write_lock())
+                    st.session_state.sync_status['failed'] = False
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"An error occurred: {str(e)}")
     
     with tab2:
-        create_dashboard(time_filter)
+        create_dashboard(time_filter, now_ist)
     
     with tab3:
-        create_schedule_section()
+        create_schedule_section(now_ist)
     
     with tab4:
-        create_plan_vs_actual_analysis(time_filter)
+        schedule_df, logged_df = load_data("Schedule"), load_data("Sheet1")
+        create_plan_vs_actual_analysis(schedule_df, logged_df, time_filter, now_ist)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file